@@ -2,25 +2,53 @@
 from __future__ import annotations
 
 import argparse
+import contextlib
 import gzip
+import io
+import itertools
 import json
+import mmap
+import os
+import queue
+import re
 import sys
-from typing import Dict, Any, Optional, List, TextIO
-from decimal import Decimal
+import tempfile
+import threading
+from concurrent.futures import ThreadPoolExecutor
+from typing import Dict, Any, Optional, List, BinaryIO, Iterable, Iterator
 
-import requests
-import ijson  # pip install ijson requests
+import requests  # pip install requests
+
+try:
+    import simdjson  # optional, only for --bulk-parse: pip install pysimdjson
+except ImportError:
+    simdjson = None
+
+try:
+    from isal import igzip, igzip_threaded  # pip install isal
+except ImportError:
+    igzip = igzip_threaded = None
 
 BULK_INDEX_URL = "https://api.scryfall.com/bulk-data"
 UA = "mtg-collection-updater/1.0 (+https://github.com)"
+GZIP_LEVEL = 1  # NDJSON compresses well even at the fastest level
+WRITE_BUFFER = 1 << 20  # hand the compressor/disk ~1 MiB at a time
+READ_CHUNK = 1 << 20  # bytes pulled from the HTTP stream per read()
+PREFETCH_CHUNKS = 8  # read-ahead bound between the download and parse threads
+MAX_CONNECTIONS = 10  # requests' default per-host pool size; extra connections get discarded
 
 
-def get_bulk_meta(dataset_type: str, timeout: float = 60.0) -> Dict[str, Any]:
+def get_bulk_meta(
+    dataset_type: str,
+    timeout: float = 60.0,
+    session: Optional[requests.Session] = None,
+) -> Dict[str, Any]:
     """
     Fetch bulk-data index and return the entry for the requested dataset_type,
     e.g. "oracle_cards" or "default_cards".
     """
-    r = requests.get(BULK_INDEX_URL, headers={"User-Agent": UA}, timeout=timeout)
+    http = session if session is not None else requests
+    r = http.get(BULK_INDEX_URL, headers={"User-Agent": UA}, timeout=timeout)
     r.raise_for_status()
     payload = r.json()
     if payload.get("object") != "list" or "data" not in payload:
@@ -33,16 +61,379 @@ def get_bulk_meta(dataset_type: str, timeout: float = 60.0) -> Dict[str, Any]:
     raise RuntimeError(f"No '{dataset_type}' entry found in bulk-data index")
 
 
-def _json_default(o):
-    if isinstance(o, Decimal):
-        return float(o)
-    raise TypeError(f"Object of type {type(o).__name__} is not JSON serializable")
+class _Tee(io.RawIOBase):
+    """Raw writer that copies every write to several already-open files."""
+
+    def __init__(self, files: List[BinaryIO]) -> None:
+        super().__init__()
+        self._files = files
+
+    def writable(self) -> bool:
+        return True
+
+    def write(self, b) -> int:
+        for f in self._files:
+            f.write(b)
+        return len(b)
+
+    def flush(self) -> None:
+        super().flush()
+        for f in self._files:
+            f.flush()
+
+
+def _open_writer(paths: List[str], stack: contextlib.ExitStack) -> BinaryIO:
+    """
+    Open one buffered writer that feeds every path in paths (all .gz or all
+    plain). For several .gz paths the data is compressed once and the
+    compressed bytes are teed to each file. Everything opened is registered
+    on stack so it is closed in the right order.
+    """
+    gz = paths[0].lower().endswith(".gz")
+    if not gz and len(paths) == 1:
+        # One buffer layer: a write(2) per WRITE_BUFFER bytes, nothing per card.
+        return stack.enter_context(open(paths[0], "wb", buffering=WRITE_BUFFER))
+    files = [stack.enter_context(open(p, "wb")) for p in paths]
+    sink = files[0] if len(files) == 1 else stack.enter_context(_Tee(files))
+    if gz:
+        if igzip_threaded is not None:
+            # Compresses WRITE_BUFFER-sized blocks on all cores; still one gzip member.
+            writer = igzip_threaded.open(
+                sink, "wb", compresslevel=GZIP_LEVEL, threads=-1, block_size=WRITE_BUFFER
+            )
+        else:
+            writer = io.BufferedWriter(
+                gzip.GzipFile(fileobj=sink, mode="wb", compresslevel=GZIP_LEVEL), buffer_size=WRITE_BUFFER
+            )
+    else:
+        writer = io.BufferedWriter(sink, buffer_size=WRITE_BUFFER)
+    return stack.enter_context(writer)
+
+
+_STRING = rb'"[^"\\]*(?:\\.[^"\\]*)*"'
+_PLAIN = rb'[^"{}\[\]]*'  # a run with no quotes or brackets
+
+# Skips everything up to the next bracket in one regex step (complete strings
+# included), so Python only runs per bracket. Stops on a quote when it cannot
+# get past a string with the data buffered so far.
+_NEXT_BRACKET_RE = re.compile(_PLAIN + rb'(?:' + _STRING + _PLAIN + rb')*["{}\[\]]')
+# A JSON string (kept as group 1) or a run of insignificant whitespace.
+_WS_RE = re.compile(rb'(' + _STRING + rb')|[ \t\r\n]+')
+
+
+def _container_re(max_depth: int) -> re.Pattern:
+    """
+    Regex for one whole container nested at most max_depth levels deep
+    (brackets and strings only, not validated). Lets a complete element be
+    found in a single C-level scan instead of a Python step per bracket.
+    """
+    body = _PLAIN + rb'(?:' + _STRING + _PLAIN + rb')*'
+    for _ in range(max_depth):
+        container = rb'[{\[]' + body + rb'[}\]]'
+        body = _PLAIN + rb'(?:(?:' + _STRING + rb'|' + container + rb')' + _PLAIN + rb')*'
+    return re.compile(container)
+
+
+# Cards nest at most 4 levels (card -> card_faces -> face -> image_uris).
+_ITEM_RE = _container_re(6)
+
+
+def _minify(raw: bytes) -> bytes:
+    """Re-encode an element that spans several lines (pretty-printed input)."""
+    # Strip whitespace lexically; numbers and strings are never decoded.
+    return _WS_RE.sub(rb"\1", raw)
+
+
+_WS = rb"[ \t\r\n]*"
+_SCALAR = rb'[^,{}\[\]" \t\r\n]+'  # number, true, false or null
+# The opening brace or comma before an object member, then its key (group 1).
+_KEY = rb"[{,]" + _WS + rb"(" + _STRING + rb")" + _WS + rb":" + _WS
+_KEY_RE = re.compile(_KEY)
+# A whole member in one scan, unless its value nests deeper than _ITEM_RE.
+_MEMBER_RE = re.compile(_KEY + rb"(?:" + _STRING + rb"|" + _ITEM_RE.pattern + rb"|" + _SCALAR + rb")")
+_STRING_RE = re.compile(_STRING)
+_SCALAR_RE = re.compile(_SCALAR)
+_EMPTY_OBJECT_RE = re.compile(rb"{" + _WS + rb"}")
+_OBJECT_END_RE = re.compile(_WS + rb"}")
+
+
+def _value_end(raw: bytes, pos: int) -> int:
+    """Return the end offset of the JSON value that starts at raw[pos]."""
+    c = raw[pos:pos + 1]
+    if c == b"{" or c == b"[":
+        # Nested too deep for _ITEM_RE: count brackets instead.
+        depth = 0
+        while True:
+            m = _NEXT_BRACKET_RE.match(raw, pos)
+            if m is None or raw[m.end() - 1] == 0x22:
+                raise ValueError("Malformed JSON object")
+            pos = m.end()
+            depth += 1 if raw[pos - 1] in b"{[" else -1
+            if depth == 0:
+                return pos
+    m = (_STRING_RE if c == b'"' else _SCALAR_RE).match(raw, pos)
+    if m is None:
+        raise ValueError("Malformed JSON object")
+    return m.end()
+
+
+def _project(payloads: Iterable[bytes], fields: List[str]) -> Iterator[bytes]:
+    """
+    Keep only the given top-level keys of each element, in their original
+    order. Members are sliced out of the raw bytes, so dropped values are
+    never decoded and kept ones stay exactly as written.
+    """
+    keep = frozenset(fields)
+    keep_raw = frozenset(f.encode("utf-8") for f in fields)
+    match_member = _MEMBER_RE.match
+    for raw in payloads:
+        if raw[:1] != b"{":
+            raise ValueError("--fields needs object elements; got a JSON array")
+        kept = []
+        pos = 0
+        while True:
+            m = match_member(raw, pos)
+            if m is not None:
+                end = m.end()
+            elif (_OBJECT_END_RE if pos else _EMPTY_OBJECT_RE).fullmatch(raw, pos):
+                break
+            else:  # a value nested too deep for _MEMBER_RE, or bad input
+                m = _KEY_RE.match(raw, pos)
+                if m is None:
+                    raise ValueError("Malformed JSON object")
+                end = _value_end(raw, m.end())
+            key = m.group(1)
+            # Escaped keys are rare; only those get decoded.
+            if (json.loads(key) in keep) if b"\\" in key else (key[1:-1] in keep_raw):
+                kept.append(raw[m.start(1):end])
+            pos = end
+        yield b"{" + b",".join(kept) + b"}"
+
+
+def _prefetch(raw: BinaryIO, chunk_size: int = READ_CHUNK, depth: int = PREFETCH_CHUNKS) -> Iterator[bytes]:
+    """
+    Read raw on a background thread and yield its chunks in order, so the
+    download (socket reads + content decoding) overlaps with parsing and
+    compression on the calling thread. At most `depth` chunks are buffered.
+    """
+    q: queue.Queue = queue.Queue(maxsize=depth)
+    stop = threading.Event()
+
+    def reader() -> None:
+        try:
+            while not stop.is_set():
+                chunk = raw.read(chunk_size)
+                q.put(chunk)
+                if not chunk:
+                    return
+        except BaseException as e:  # re-raised on the consumer side
+            q.put(e)
 
+    t = threading.Thread(target=reader, name="bulk-download", daemon=True)
+    t.start()
+    try:
+        while True:
+            chunk = q.get()
+            if isinstance(chunk, BaseException):
+                raise chunk
+            if not chunk:
+                return
+            yield chunk
+    finally:
+        # Free queue slots so a blocked put() returns and the reader sees `stop`.
+        stop.set()
+        while True:
+            try:
+                q.get_nowait()
+            except queue.Empty:
+                break
+        t.join()
 
-def _open_writer(path: str) -> TextIO:
-    if path.lower().endswith(".gz"):
-        return gzip.open(path, "wt", encoding="utf-8")
-    return open(path, "w", encoding="utf-8")
+
+_SEPARATORS = b" \t\r\n,"  # what may sit between top-level array elements
+
+
+def _unexpected_scalar(depth: int) -> ValueError:
+    if depth == 0:
+        return ValueError("Expected a top-level JSON array")
+    return ValueError("Top-level array has a non-object/array element; only containers are supported")
+
+
+def _iter_items_raw(chunks: Iterable[bytes]) -> Iterator[bytes]:
+    """
+    Split the top-level JSON array into the raw bytes of each element by
+    tracking bracket depth (skipping over strings), without decoding anything.
+    Scryfall writes one card per line, so elements normally pass through as-is.
+    Only object/array elements are supported; a scalar element raises
+    ValueError rather than being dropped.
+    """
+    buf = b""
+    pos = 0  # scan position in buf
+    start = -1  # offset of the current element in buf, -1 between elements
+    depth = 0
+    match = _NEXT_BRACKET_RE.match
+    match_item = _ITEM_RE.match
+    for chunk in chunks:
+        cut = start if start >= 0 else pos
+        buf = buf[cut:] + chunk
+        pos -= cut
+        if start >= 0:
+            start = 0
+        while True:
+            m = match(buf, pos)
+            if m is None:
+                if depth <= 1 and buf[pos:].strip(_SEPARATORS):
+                    raise _unexpected_scalar(depth)
+                pos = len(buf)
+                break
+            end = m.end()
+            c = buf[end - 1]
+            if depth <= 1 and (c == 0x22 or buf[pos:end - 1].strip(_SEPARATORS)):
+                raise _unexpected_scalar(depth)
+            if c == 0x22:  # '"': need the next chunk to get past this string
+                pos = end - 1
+                break
+            if c == 0x7B or c == 0x5B:  # '{' '['
+                if depth == 0 and c != 0x5B:
+                    raise ValueError("Expected a top-level JSON array")
+                if depth == 1:
+                    # Fast path: the whole element is buffered and not too deep.
+                    e = match_item(buf, end - 1)
+                    if e is not None:
+                        item = buf[end - 1:e.end()]
+                        yield _minify(item) if b"\n" in item else item
+                        pos = e.end()
+                        continue
+                depth += 1
+                if depth == 2:
+                    start = end - 1
+            else:
+                if depth == 0:
+                    raise ValueError("Expected a top-level JSON array")
+                depth -= 1
+                if depth == 1:
+                    item = buf[start:end]
+                    yield _minify(item) if b"\n" in item else item
+                    start = -1
+                elif depth == 0:
+                    return
+            pos = end
+    raise ValueError("Unexpected end of JSON array")
+
+
+def _spool(body: BinaryIO, stack: contextlib.ExitStack) -> BinaryIO:
+    """Copy body into a temp file (reading on a prefetch thread) and return it."""
+    tmp = stack.enter_context(tempfile.TemporaryFile())
+    tmp.writelines(_prefetch(body))
+    tmp.flush()
+    return tmp
+
+
+def _iter_items_simdjson(spooled: BinaryIO) -> Iterator[bytes]:
+    """
+    mmap the file holding the whole body and parse it in one go with
+    simdjson, then yield each array element as minified JSON bytes.
+    Needs the whole parsed document in memory. Rejects the same input as
+    _iter_items_raw, with the same errors.
+    """
+    if not os.fstat(spooled.fileno()).st_size:
+        raise _unexpected_scalar(0)
+    with mmap.mmap(spooled.fileno(), 0, access=mmap.ACCESS_READ) as mm:
+        doc = simdjson.Parser().parse(mm)
+    if not isinstance(doc, simdjson.Array):
+        raise _unexpected_scalar(0)
+    for el in doc:
+        if not isinstance(el, (simdjson.Object, simdjson.Array)):
+            raise _unexpected_scalar(1)
+        yield el.mini
+
+
+def _content_encoding(resp: requests.Response) -> str:
+    return resp.headers.get("Content-Encoding", "").strip().lower() or "identity"
+
+
+def _open_body(resp: requests.Response) -> BinaryIO:
+    """
+    Return a reader over the decoded response body. A gzip Content-Encoding
+    is inflated with ISA-L when available, otherwise by urllib3 (zlib).
+    """
+    if igzip is not None and _content_encoding(resp) == "gzip":
+        resp.raw.decode_content = False
+        return igzip.IGzipFile(fileobj=resp.raw, mode="rb")
+    resp.raw.decode_content = True
+    return resp.raw
+
+
+def _fetch_ranges(
+    http: Any,
+    url: str,
+    timeout: float,
+    connections: int,
+    stack: contextlib.ExitStack,
+) -> Optional[BinaryIO]:
+    """
+    Download url as `connections` parallel byte ranges into a temp file and
+    return a temp file holding the decoded body: the downloaded file itself
+    for an identity body, an inflated copy for gzip. Only gzip or identity
+    bodies are requested and accepted; returns None when the server does not
+    advertise byte ranges or picks another encoding, so the caller can fall
+    back to a single GET.
+    """
+    if not hasattr(os, "pwrite"):
+        return None
+    # Pin the representation: every range must slice the same encoded bytes.
+    base_headers = {"User-Agent": UA, "Accept-Encoding": "gzip"}
+    head = http.head(url, headers=base_headers, timeout=timeout, allow_redirects=True)
+    size = int(head.headers.get("Content-Length") or 0)
+    if not head.ok or head.headers.get("Accept-Ranges", "").lower() != "bytes" or size <= 0:
+        return None
+    encoding = _content_encoding(head)
+    if encoding not in ("identity", "gzip"):
+        return None
+
+    tmp = stack.enter_context(tempfile.TemporaryFile())
+    fd = tmp.fileno()
+    os.ftruncate(fd, size)
+    step = -(-size // connections)
+
+    def fetch(lo: int) -> None:
+        hi = min(lo + step, size) - 1
+        headers = {**base_headers, "Range": f"bytes={lo}-{hi}"}
+        with http.get(head.url, headers=headers, stream=True, timeout=timeout) as r:
+            r.raise_for_status()
+            if r.status_code != 206:
+                raise RuntimeError(f"Server ignored range request for {head.url}")
+            if _content_encoding(r) != encoding:
+                raise RuntimeError(
+                    f"Range response for {head.url} is {_content_encoding(r)}-encoded, expected {encoding}"
+                )
+            content_range = r.headers.get("Content-Range", "").strip()
+            if content_range != f"bytes {lo}-{hi}/{size}":
+                raise RuntimeError(
+                    f"Range response for {head.url} has Content-Range {content_range!r}, expected bytes {lo}-{hi}/{size}"
+                )
+            off = lo
+            # Ranges cover the encoded representation, so keep bytes as sent.
+            for chunk in r.raw.stream(READ_CHUNK, decode_content=False):
+                view = memoryview(chunk)
+                while view:
+                    n = os.pwrite(fd, view, off)
+                    view = view[n:]
+                    off += n
+            if off != hi + 1:
+                raise RuntimeError(f"Short range response for {head.url}: bytes={lo}-{hi}")
+
+    # The workers share http. That is safe for these calls: they only set
+    # per-request headers, and the urllib3 pool underneath is thread-safe.
+    # connections <= MAX_CONNECTIONS keeps every socket in the pool for reuse.
+    with ThreadPoolExecutor(max_workers=connections) as pool:
+        list(pool.map(fetch, range(0, size, step)))
+
+    if encoding == "identity":
+        return tmp  # parsed in place, no second copy
+    gz = igzip.IGzipFile if igzip is not None else gzip.GzipFile
+    with tmp, gz(fileobj=tmp, mode="rb") as body:  # drop the compressed copy once inflated
+        return _spool(body, stack)
 
 
 def stream_bulk_json_array_to_ndjson(
@@ -50,38 +441,70 @@ def stream_bulk_json_array_to_ndjson(
     out_paths: List[str],
     timeout: float = 600.0,
     limit: Optional[int] = None,
+    bulk_parse: bool = False,
+    session: Optional[requests.Session] = None,
+    connections: int = 1,
+    fields: Optional[List[str]] = None,
 ) -> int:
     """
     Stream the big JSON array at download_uri into one or more NDJSON files.
     Each object is written as a single line to every path in out_paths.
+    With bulk_parse, the whole body is parsed at once by simdjson instead,
+    and is fetched over `connections` parallel range requests if the server
+    supports them. Pass a session to reuse pooled keep-alive connections.
+    If fields is given, only those top-level keys are kept in each line.
     Returns lines written.
     """
     if not out_paths:
         raise ValueError("out_paths must contain at least one path")
+    if limit is not None and limit < 0:
+        raise ValueError("limit must be >= 0")
+    if not 1 <= connections <= MAX_CONNECTIONS:
+        raise ValueError(f"connections must be between 1 and {MAX_CONNECTIONS}")
+    if bulk_parse and simdjson is None:
+        raise RuntimeError("bulk_parse needs simdjson: pip install pysimdjson")
 
-    with requests.get(
-        download_uri,
-        headers={"User-Agent": UA},
-        stream=True,
-        timeout=timeout,
-    ) as resp:
-        resp.raise_for_status()
-        resp.raw.decode_content = True  # transparent gzip decode if server uses it
-
-        writers = [_open_writer(p) for p in out_paths]
-        count = 0
-        try:
-            for obj in ijson.items(resp.raw, "item"):
-                line = json.dumps(obj, ensure_ascii=False, default=_json_default) + "\n"
-                for w in writers:
-                    w.write(line)
-                count += 1
-                if limit and count >= limit:
-                    break
-        finally:
-            for w in writers:
-                w.close()
-        return count
+    http = session if session is not None else requests
+    gz_paths = [p for p in out_paths if p.lower().endswith(".gz")]
+    plain_paths = [p for p in out_paths if not p.lower().endswith(".gz")]
+    count = 0
+    with contextlib.ExitStack() as stack:
+        spooled = None
+        if bulk_parse and connections > 1:
+            # The whole body is needed before parsing anyway, so fetch it in parallel.
+            spooled = _fetch_ranges(http, download_uri, timeout, connections, stack)
+        if spooled is None:
+            resp = stack.enter_context(
+                http.get(download_uri, headers={"User-Agent": UA}, stream=True, timeout=timeout)
+            )
+            resp.raise_for_status()
+            body = _open_body(resp)
+            if bulk_parse:
+                spooled = _spool(body, stack)
+
+        if bulk_parse:
+            payloads = _iter_items_simdjson(spooled)
+        else:
+            chunks = _prefetch(body)
+            stack.callback(chunks.close)  # stop the download thread if we broke out early
+            payloads = _iter_items_raw(chunks)
+        writes = [_open_writer(g, stack).write for g in (gz_paths, plain_paths) if g]
+        if fields:
+            payloads = _project(payloads, fields)
+        if limit:
+            payloads = itertools.islice(payloads, limit)
+        # Two buffered writes beat building payload + b"\n" per card.
+        if len(writes) == 1:
+            write = writes[0]
+            for count, payload in enumerate(payloads, 1):
+                write(payload)
+                write(b"\n")
+        else:
+            for count, payload in enumerate(payloads, 1):
+                for write in writes:
+                    write(payload)
+                    write(b"\n")
+    return count
 
 
 def main(argv: Optional[list[str]] = None) -> int:
@@ -90,26 +513,62 @@ def main(argv: Optional[list[str]] = None) -> int:
     p.add_argument("--also-plain", default=None, help="Optional: also write a plain NDJSON to this path (e.g., cards.ndjson)")
     p.add_argument("--timeout", type=float, default=600.0, help="HTTP timeout seconds (default: 600)")
     p.add_argument("--limit", type=int, default=None, help="TESTING: only write first N cards")
+    p.add_argument(
+        "--bulk-parse",
+        action="store_true",
+        help="Download fully, then parse with simdjson (needs: pip install pysimdjson, and RAM for the whole dataset)",
+    )
+    p.add_argument(
+        "--connections",
+        type=int,
+        default=4,
+        help=f"With --bulk-parse: parallel range requests for the download, 1-{MAX_CONNECTIONS} (default: 4)",
+    )
+    p.add_argument(
+        "--fields",
+        default=None,
+        help="Comma-separated top-level card fields to keep (e.g., name,mana_cost,type_line); default: all",
+    )
     args = p.parse_args(argv)
+    if args.limit is not None and args.limit < 0:
+        p.error("--limit must be >= 0")
+    if not 1 <= args.connections <= MAX_CONNECTIONS:
+        p.error(f"--connections must be between 1 and {MAX_CONNECTIONS}")
+    fields = None
+    if args.fields is not None:
+        fields = [f.strip() for f in args.fields.split(",") if f.strip()]
+        if not fields:
+            p.error("--fields needs at least one field name")
 
-    # Switch to Oracle Cards dataset
-    meta = get_bulk_meta("oracle_cards", timeout=min(60.0, args.timeout))
-    print(
-        f"[info] oracle_cards: updated_at={meta.get('updated_at')} size={meta.get('size')} enc={meta.get('content_encoding')}",
-        file=sys.stderr,
-    )
-    print(f"[info] downloading: {meta['download_uri']}", file=sys.stderr)
+    # One session for the index and the bulk file: pooled keep-alive connections.
+    with requests.Session() as session:
+        # Switch to Oracle Cards dataset
+        meta = get_bulk_meta("oracle_cards", timeout=min(60.0, args.timeout), session=session)
+        print(
+            f"[info] oracle_cards: updated_at={meta.get('updated_at')} size={meta.get('size')} enc={meta.get('content_encoding')}",
+            file=sys.stderr,
+        )
+        print(
+            f"[info] backends: parse={'simdjson' if args.bulk_parse else 'python'} "
+            f"gzip={'isal' if igzip is not None else 'zlib'}",
+            file=sys.stderr,
+        )
+        print(f"[info] downloading: {meta['download_uri']}", file=sys.stderr)
 
-    out_paths = [args.output]
-    if args.also_plain:
-        out_paths.append(args.also_plain)
+        out_paths = [args.output]
+        if args.also_plain:
+            out_paths.append(args.also_plain)
 
-    written = stream_bulk_json_array_to_ndjson(
-        meta["download_uri"],
-        out_paths,
-        timeout=args.timeout,
-        limit=args.limit,
-    )
+        written = stream_bulk_json_array_to_ndjson(
+            meta["download_uri"],
+            out_paths,
+            timeout=args.timeout,
+            limit=args.limit,
+            bulk_parse=args.bulk_parse,
+            session=session,
+            connections=args.connections,
+            fields=fields,
+        )
     print(f"[done] wrote {written} NDJSON lines -> {', '.join(out_paths)}", file=sys.stderr)
     return 0
 
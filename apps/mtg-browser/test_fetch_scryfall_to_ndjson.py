@@ -0,0 +1,265 @@
+"""
+Tests for the array splitters and the ranged download in
+fetch_scryfall_to_ndjson.py.
+
+Run from apps/mtg-browser:
+    python -m pytest -q
+"""
+import contextlib
+import gzip
+import http.server
+import json
+import tempfile
+import threading
+import zlib
+
+import pytest
+import requests
+
+import fetch_scryfall_to_ndjson
+from fetch_scryfall_to_ndjson import (
+    _fetch_ranges,
+    _project,
+    _iter_items_raw,
+    _iter_items_simdjson,
+    main,
+    simdjson,
+    stream_bulk_json_array_to_ndjson,
+)
+
+
+def _split(data: bytes, chunk_size: int):
+    chunks = (data[i:i + chunk_size] for i in range(0, len(data), chunk_size))
+    return list(_iter_items_raw(chunks))
+
+
+CARDS = [
+    {"name": "Brace {[ in ]} string", "mana_cost": "{2}{W}"},
+    {"name": 'Escaped \\" quote and \\\\ slash', "oracle_text": "line1\nline2"},
+    {"card_faces": [{"image_uris": {"normal": "x"}}, {"name": "}"}], "cmc": 3.0},
+    [1, [2, [3]], "]"],
+    {},
+]
+COMPACT = b"[\n" + b",\n".join(json.dumps(c).encode() for c in CARDS) + b"\n]"
+PRETTY = json.dumps(CARDS, indent=2).encode()
+
+
+@pytest.mark.parametrize("data", [COMPACT, PRETTY], ids=["compact", "pretty"])
+@pytest.mark.parametrize("chunk_size", [1, 2, 3, 7, 64, 1 << 20])
+def test_split_across_chunk_boundaries(data, chunk_size):
+    items = _split(data, chunk_size)
+    assert [json.loads(x) for x in items] == CARDS
+    assert all(b"\n" not in x for x in items)
+
+
+def test_compact_elements_pass_through_unchanged():
+    items = _split(COMPACT, 5)
+    assert items == [json.dumps(c).encode() for c in CARDS]
+
+
+def test_deeply_nested_element():
+    deep = [{"a": [[[[[[[[["x}"]]]]]]]]]}, {"b": 1}]
+    assert [json.loads(x) for x in _split(json.dumps(deep).encode(), 3)] == deep
+
+
+def test_empty_array():
+    assert _split(b" [ ] ", 1) == []
+
+
+@pytest.mark.parametrize(
+    "data",
+    [b'[1, "a", {"x":1}, null, [2]]', b'[{"x":1}, 2]', b'[{"x":1}, "s"]', b'{"a":[1]}', b'"x"'],
+)
+def test_scalars_and_non_arrays_are_rejected(data):
+    for chunk_size in (1, 4, 100):
+        with pytest.raises(ValueError):
+            _split(data, chunk_size)
+
+
+@pytest.mark.skipif(simdjson is None, reason="needs pysimdjson")
+@pytest.mark.parametrize(
+    "data", [b'[{"x":1}, 2]', b'[{"x":1}, "s"]', b'{"a":[1]}', b'"x"', b"", b" "]
+)
+def test_bulk_parse_rejects_what_the_splitter_rejects(data):
+    with tempfile.TemporaryFile() as f, pytest.raises(ValueError) as bulk:
+        f.write(data)
+        f.flush()
+        list(_iter_items_simdjson(f))
+    if data.strip():
+        with pytest.raises(ValueError) as raw:
+            _split(data, 100)
+        assert str(bulk.value) == str(raw.value)
+
+
+@pytest.mark.parametrize("chunk_size", [3, 1 << 20])
+def test_fields_keeps_selected_members_as_written(chunk_size):
+    fields = ["name", "card_faces", "cmc", "b", "n"]
+    objects = [x for x in _split(COMPACT, chunk_size) if x[:1] == b"{"]
+    assert [json.loads(x) for x in _project(objects, fields)] == [
+        {k: v for k, v in c.items() if k in fields} for c in CARDS if isinstance(c, dict)
+    ]
+    raw = b'{"n": 1e2, "x": {"}": [[[[[[[[1]]]]]]]]}, "cmc": 1.50, "b": 123456789012345678901234567890}'
+    assert list(_project([raw], fields)) == [b'{"n": 1e2,"cmc": 1.50,"b": 123456789012345678901234567890}']
+    assert list(_project([raw], ["x"])) == [b'{"x": {"}": [[[[[[[[1]]]]]]]]}}']
+
+
+@pytest.mark.parametrize(
+    "raw, expected",
+    [
+        (b"{}", b"{}"),
+        (b'{"other":1}', b"{}"),
+        (b'{"na\\u006de":"x","name":"y"}', b'{"na\\u006de":"x","name":"y"}'),
+        (b'{"a":true,"name":null}', b'{"name":null}'),
+    ],
+)
+def test_fields_edge_cases(raw, expected):
+    assert list(_project([raw], ["name"])) == [expected]
+
+
+@pytest.mark.parametrize("raw", [b'{"a"}', b'{"a":}', b'{"a":1', b'{"a":1 2}', b"{,}", b'{"a":"x}'])
+def test_fields_rejects_malformed_objects(raw):
+    with pytest.raises(ValueError, match="Malformed"):
+        list(_project([raw], ["a"]))
+
+
+def test_fields_rejects_array_elements():
+    with pytest.raises(ValueError, match="object"):
+        list(_project([b'{"a":1}', b"[1,2]"], ["a"]))
+
+
+def test_truncated_input_raises():
+    with pytest.raises(ValueError):
+        _split(b'[{"a":"x\\', 2)
+
+
+def test_pretty_input_keeps_numbers_as_written():
+    data = b'[\n  {\n    "cmc": 1.50,\n    "n": 1e2,\n    "b": 123456789012345678901234567890,\n    "s": "a  b"\n  }\n]'
+    assert _split(data, 4) == [b'{"cmc":1.50,"n":1e2,"b":123456789012345678901234567890,"s":"a  b"}']
+
+
+BODY = b"[\n" + b",\n".join(json.dumps({"id": i, "name": f"card {i}"}).encode() for i in range(200)) + b"\n]"
+
+
+class _Handler(http.server.BaseHTTPRequestHandler):
+    """Serves BODY; the path picks how the server (mis)behaves."""
+
+    def log_message(self, *args):
+        pass
+
+    def do_HEAD(self):
+        self.do_GET(head=True)
+
+    def do_GET(self, head=False):
+        mode = self.path.strip("/")
+        self.server.requests.append((self.command, self.headers.get("Range"), self.headers.get("Accept-Encoding")))
+        data, encoding = BODY, None
+        if mode in ("gzip", "mixed", "bad-range", "short"):
+            data, encoding = gzip.compress(BODY, mtime=0), "gzip"
+        elif mode == "deflate":
+            data, encoding = zlib.compress(BODY), "deflate"
+        rng = self.headers.get("Range")
+        if rng and mode != "ignore-range":
+            lo, hi = map(int, rng.split("=")[1].split("-"))
+            total = len(data)
+            data = data[lo:hi + 1]
+            if mode == "short":
+                data = data[:-1]
+            self.send_response(206)
+            self.send_header("Content-Range", f"bytes {lo}-{hi + (mode == 'bad-range')}/{total}")
+            if mode == "mixed":
+                encoding = None
+        else:
+            self.send_response(200)
+        if encoding:
+            self.send_header("Content-Encoding", encoding)
+        if mode != "no-ranges":
+            self.send_header("Accept-Ranges", "bytes")
+        if not (head and mode == "no-length"):
+            self.send_header("Content-Length", str(len(data)))
+        self.end_headers()
+        if not head:
+            self.wfile.write(data)
+
+
+@pytest.fixture
+def server():
+    srv = http.server.ThreadingHTTPServer(("127.0.0.1", 0), _Handler)
+    srv.requests = []
+    t = threading.Thread(target=srv.serve_forever, args=(0.05,), daemon=True)
+    t.start()
+    yield srv, f"http://127.0.0.1:{srv.server_address[1]}"
+    srv.shutdown()
+    srv.server_close()
+    t.join()
+
+
+def _ranges(url, connections=4):
+    with requests.Session() as session, contextlib.ExitStack() as stack:
+        f = _fetch_ranges(session, url, 10.0, connections, stack)
+        return None if f is None else (f.seek(0), f.read())[1]
+
+
+@pytest.mark.parametrize("mode", ["identity", "gzip"])
+def test_fetch_ranges_reassembles_the_body(server, monkeypatch, mode):
+    srv, base = server
+    if mode == "identity":  # parsed from the pwritten file, never copied
+        monkeypatch.setattr(fetch_scryfall_to_ndjson, "_spool", None)
+    assert _ranges(f"{base}/{mode}") == BODY
+    gets = [r for r in srv.requests if r[0] == "GET"]
+    assert len(gets) == 4 and all(r[1] for r in gets)
+    assert all(r[2] == "gzip" for r in srv.requests)
+
+
+@pytest.mark.parametrize("mode", ["no-ranges", "no-length", "deflate"])
+def test_fetch_ranges_falls_back(server, mode):
+    srv, base = server
+    assert _ranges(f"{base}/{mode}") is None
+    assert [r[0] for r in srv.requests] == ["HEAD"]
+
+
+@pytest.mark.parametrize(
+    "mode, error",
+    [
+        ("ignore-range", "ignored range"),
+        ("mixed", "identity-encoded, expected gzip"),
+        ("bad-range", "Content-Range"),
+        ("short", "Short range"),
+    ],
+)
+def test_fetch_ranges_rejects_bad_responses(server, mode, error):
+    _, base = server
+    with pytest.raises(RuntimeError, match=error):
+        _ranges(f"{base}/{mode}")
+
+
+@pytest.mark.skipif(simdjson is None, reason="needs pysimdjson")
+@pytest.mark.parametrize("mode", ["identity", "gzip", "deflate"])
+def test_bulk_parse_over_ranges(server, tmp_path, mode):
+    # deflate used to reach simdjson still compressed (UNCLOSED_STRING).
+    _, base = server
+    out = tmp_path / "cards.ndjson"
+    n = stream_bulk_json_array_to_ndjson(f"{base}/{mode}", [str(out)], bulk_parse=True, connections=4)
+    assert n == 200
+    assert [json.loads(x) for x in out.read_bytes().splitlines()] == json.loads(BODY)
+
+
+@pytest.mark.parametrize("connections", [0, 11])
+def test_connections_out_of_range_is_rejected(tmp_path, connections):
+    with pytest.raises(ValueError):
+        stream_bulk_json_array_to_ndjson("http://unused", [str(tmp_path / "x")], connections=connections)
+    with pytest.raises(SystemExit):
+        main(["--connections", str(connections)])
+
+
+@pytest.mark.parametrize("bulk_parse", [False, True] if simdjson is not None else [False])
+def test_fields_end_to_end(server, tmp_path, bulk_parse):
+    _, base = server
+    out = tmp_path / "cards.ndjson"
+    stream_bulk_json_array_to_ndjson(f"{base}/gzip", [str(out)], bulk_parse=bulk_parse, fields=["name"], limit=2)
+    assert [json.loads(x) for x in out.read_bytes().splitlines()] == [{"name": "card 0"}, {"name": "card 1"}]
+
+
+@pytest.mark.parametrize("value", ["", ",", " , "])
+def test_empty_fields_is_rejected(value):
+    with pytest.raises(SystemExit):
+        main(["--fields", value])